@@ -2,11 +2,18 @@
 """Analyse nextflow logs."""
 import sys
 import os
+import re
+import mmap
+import functools
+from array import array
+import contextlib
 from collections import defaultdict
 import subprocess
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 import datetime
 from .version import __version__
+from .utils import OPEN_DIR_FD_SUPPORTED
 
 __author__ = "Bogdan Kirilenko"
 
@@ -15,6 +22,10 @@ NF_EXE_COMPLETE_TAG = "Goodbye"
 NF_TASK_SUBMITTER_TAG = "[Task submitter]"
 NF_TASK_MONITOR_TAG = "[Task monitor]"
 NF_SESSION_TAG = "nextflow.Session"
+# max number of threads to read task files with
+IO_MAX_WORKERS = 32
+TASK_STDOUT_FILE = ".command.out"
+TASK_STDERR_FILE = ".command.err"
 
 # Q: maybe there is a more pythonic way?
 NF_MON_TO_NUM = {
@@ -32,6 +43,151 @@ NF_MON_TO_NUM = {
     "Dec": 12,
 }
 
+# a single pattern to catch all the log events we are interested in
+# each alternative corresponds to one event type, all other lines are skipped
+# by the regex engine without any python-level processing
+# event type is the name of the outer group, so match.lastgroup classifies the line
+NF_MONITOR_EVENT = "monitor"
+NF_SUBMITTER_EVENT = "submitter"
+NF_LAUNCHER_EVENT = "launch"
+NF_GOODBYE_EVENT = "goodbye"
+# the only place where the year is mentioned, like:
+#   Created: 01-11-2020 15:14 UTC (16:14 CEST)
+NF_CREATED_EVENT = "created"
+NF_LOG_EVENT_RE = re.compile(
+    rb"^(?:(?P<date>\S+) (?P<time>\S+) (?:"
+    rb"(?P<monitor>\[Task monitor\] DEBUG n\.processor\.TaskPollingMonitor - [^\n]*?TaskHandler\["
+    # fields are written in this order, grid executors prepend the jobId field
+    rb"(?:jobId: [^;\n]*; )?id: (?P<task_id>[^;\n]*); name: (?P<name>[^;\n]*); status: (?P<status>[^;\n]*); "
+    # grid executors continue after the path with " started: <ms>; exited: <ts>; "
+    rb"exit: (?P<exit>[^;\n]*); [^\n]*?workDir: (?P<work_dir>[^;\]\s]*))"
+    rb"|(?P<submitter>\[Task submitter\] [^\n]*?nextflow\.Session - \[(?P<submitted>[^\]\n]+)\])"
+    rb"|(?P<launch>[^\n]*? nextflow\.cli\.Launcher [^\n]*?\$> (?P<launcher>[^\n]*))"
+    rb"|(?P<goodbye>[^\n]*? Goodbye(?!\S))"
+    rb")"
+    rb"|(?P<created>  Created:[ \t]+[^-\s]+-[^-\s]+-(?P<year>\d+)\s))",
+    re.MULTILINE,
+)
+# job times are stored as integer microseconds since NF_TIME_ORIGIN
+NF_TIME_ORIGIN = datetime.datetime(1, 1, 1)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+@contextlib.contextmanager
+def _map_log_file(log_file):
+    """Memory-map a nextflow log file for regex scanning.
+
+    All the parsers share a single mapping instead of
+    reading the file again for each piece of data.
+    """
+    if os.path.getsize(log_file) == 0:
+        # mmap cannot map an empty file
+        yield b""
+        return
+    with open(log_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _get_log_task_events(log_data, start, end):
+    """Extract launcher command and task events from log_data[start: end].
+
+    Returns launcher command (None if not found there) and a list of
+    ((task id, name, status, exit, work dir), time data) tuples.
+    """
+    launcher_cmd = None
+    task_events = []
+    for event in NF_LOG_EVENT_RE.finditer(log_data, start, end):
+        # extract specific project data here
+        event_type = event.lastgroup
+        if event_type == NF_LAUNCHER_EVENT:
+            launcher_cmd = event.group("launcher").decode().rstrip()
+        elif event_type == NF_MONITOR_EVENT:
+            # something related to one of tasks
+            time_data = f"{event.group('date').decode()} {event.group('time').decode()} "
+            task_fields = tuple(
+                value.decode() for value in event.group("task_id", "name", "status", "exit", "work_dir")
+            )
+            task_events.append((task_fields, time_data))
+    return launcher_cmd, task_events
+
+
+def _parse_log_chunk(log_file, start, end):
+    """Parse a part of the log file.
+
+    A top-level function, so process pool can pickle it.
+    """
+    with _map_log_file(log_file) as log_data:
+        return _get_log_task_events(log_data, start, end)
+
+
+def _split_log_data(log_data, parts):
+    """Split log data into up to parts (start, end) chunks at line boundaries."""
+    size = len(log_data)
+    bounds = [0]
+    for num in range(1, parts):
+        line_end = log_data.find(b"\n", max(size * num // parts, bounds[-1]))
+        if line_end == -1:
+            break
+        bounds.append(line_end + 1)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if start < end]
+
+
+def _read_file(path, dir_fd=None):
+    """Read file content, return None if the file doesn't exist.
+
+    Works on a bare file descriptor: open, fstat, one read, close.
+    Task files are tiny, buffered text io only adds syscalls here.
+    If dir_fd is given, path is resolved relative to that directory.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY, dir_fd=dir_fd)
+    except FileNotFoundError:
+        return None
+    try:
+        size = os.fstat(fd).st_size
+        content = os.read(fd, size + 1)
+        if len(content) > size:
+            # the file grew after fstat: read the rest
+            chunks = [content]
+            while chunks[-1]:
+                chunks.append(os.read(fd, 1 << 16))
+            content = b"".join(chunks)
+    finally:
+        os.close(fd)
+    return content.decode()
+
+
+def _read_dir_files(dir_path, names):
+    """Read several files from one directory, None for missing ones.
+
+    The directory path is resolved once, files are opened relative to it.
+    """
+    if not OPEN_DIR_FD_SUPPORTED:
+        return [_read_file(os.path.join(dir_path, name)) for name in names]
+    try:
+        dir_fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    except FileNotFoundError:
+        return [None for _ in names]
+    try:
+        return [_read_file(name, dir_fd=dir_fd) for name in names]
+    finally:
+        os.close(dir_fd)
+
+
+def _read_files(paths):
+    """Read a bunch of small files concurrently.
+
+    On network filesystems per-file open latency dominates,
+    overlapping the reads hides it.
+    """
+    if len(paths) == 0:
+        return []
+    workers = min(IO_MAX_WORKERS, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_read_file, paths))
+
 
 class NFTaskHandler:
     """Nextflow task execution handler data."""
@@ -42,53 +198,105 @@ class NFTaskHandler:
         self.status = status
         self.exit = exit
         self.wd = work_dir
+        # task files paths
+        self._cmd_path = os.path.join(work_dir, ".command.sh")
+        self._run_path = os.path.join(work_dir, ".command.run")
+        self._stdout_path = os.path.join(work_dir, TASK_STDOUT_FILE)
+        self._stderr_path = os.path.join(work_dir, TASK_STDERR_FILE)
+        # filled by prefetch_outputs
+        self.stdout = None
+        self.stderr = None
 
-        # self.stdout = self.__read_task_stdout()
-        # self.stderr = self.__read_task_stderr()
-
+    @staticmethod
+    def prefetch_outputs(tasks):
+        """Read stdout and stderr of many tasks at once."""
+        tasks = list(tasks)
+        if len(tasks) == 0:
+            return
+        # both files of a task are read via a single work dir lookup
+        workers = min(IO_MAX_WORKERS, len(tasks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            contents = executor.map(
+                lambda task: _read_dir_files(task.wd, (TASK_STDOUT_FILE, TASK_STDERR_FILE)),
+                tasks
+            )
+            for task, (stdout, stderr) in zip(tasks, contents):
+                task.stdout = stdout
+                task.stderr = stderr
 
     def get_task_stdout(self):
         """Get command stdout."""
-        stdout_path = os.path.join(self.wd, ".command.out")
-        with open(stdout_path, "r") as f:
+        if self.stdout is not None:
+            return self.stdout
+        with open(self._stdout_path, "r") as f:
             return f.read()
 
     def get_task_stderr(self):
         """Get command stderr."""
-        stderr_path = os.path.join(self.wd, ".command.err")
-        with open(stderr_path, "r") as f:
+        if self.stderr is not None:
+            return self.stderr
+        with open(self._stderr_path, "r") as f:
             return f.read()
 
     def get_cmd(self):
         """Extract exact task command."""
-        cmd_path = os.path.join(self.wd, ".command.sh")
-        with open(cmd_path, "r") as f:
+        with open(self._cmd_path, "r") as f:
             return f.read()
 
     def execute_again(self):
-        """Execute the command again."""
+        """Execute the command again, return the exit code."""
         # TODO: make a better implementation
         # handle errors etc
-        exe_file = os.path.join(self.wd, ".command.run")
-        subprocess.call(exe_file, shell=True)
+        # nextflow writes .command.run without the exec bit and runs it
+        # with bash from the task work dir, so do the same
+        return subprocess.run(["bash", self._run_path], cwd=self.wd, check=False).returncode
+
+    @staticmethod
+    def bulk_execute_again(tasks, max_workers=8):
+        """Execute commands of many tasks again, return their exit codes."""
+        tasks = list(tasks)
+        if not tasks:
+            return []
+        # the work is done by child processes, threads are enough to wait for them
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            return list(executor.map(NFTaskHandler.execute_again, tasks))
 
     # def __repr__(self):  # TODO
 
 
 class NextflowLog:
-    def __init__(self, logs_dir):
-        """Read logs from nextflow dir."""
+    def __init__(self, logs_dir, workers=1):
+        """Read logs from nextflow dir.
+
+        workers: number of processes to parse the log file with,
+        worth increasing for huge log files only.
+        """
         self.logs_dir = logs_dir
+        self.workers = workers
         self.nextflow_log_file = os.path.join(self.logs_dir, ".nextflow.log")
         self.nextflow_work_dir = os.path.join(self.logs_dir, "work")
         self.nextflow_nf_dir = os.path.join(self.logs_dir, ".nextflow")
         self.__check_valid_nf_dir()
         # init fields
         self.launcher_cmd = ""
-        self.command_to_tasks = defaultdict(list)
+        # (task, time data) for each task event, in the log order
+        self._task_events = []
+        # filled on the first command_to_tasks access
+        self._command_to_tasks = None
+        # task work dir -> .command.sh content
+        self._cmd_cache = {}
         self.__parse_nf_log_file()
 
-        pass
+    @property
+    def command_to_tasks(self):
+        """Task command -> list of (task, time data) tuples.
+
+        Requires reading .command.sh of each task, so it's done
+        on the first access only.
+        """
+        if self._command_to_tasks is None:
+            self._command_to_tasks = self.__map_commands_to_tasks()
+        return self._command_to_tasks
 
     def __check_valid_nf_dir(self):
         """Check that provided directory is actual nextflow project dir."""
@@ -106,41 +314,43 @@ class NextflowLog:
             raise ValueError(err_msg)
 
     def __parse_nf_log_file(self):
-        """Parse .nextflow.log file."""
-        f = open(self.nextflow_log_file, "r")
-        for line in f:
-            # extract specific project data here
-            # TODO: rm magic strings
-            if "DEBUG nextflow.cli.Launcher" in line:
-                self.launcher_cmd = line.rstrip().split("$> ")[-1]
+        """Parse .nextflow.log file.
+
+        If workers > 1, parts of the file are parsed in parallel processes.
+        """
+        with _map_log_file(self.nextflow_log_file) as log_data:
+            if self.workers > 1:
+                chunks = _split_log_data(log_data, self.workers)
+            else:
+                chunk_results = [_get_log_task_events(log_data, 0, len(log_data))]
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(_parse_log_chunk, self.nextflow_log_file, start, end)
+                           for start, end in chunks]
+                chunk_results = [future.result() for future in futures]
+        # merge the chunks keeping the log order
+        for launcher_cmd, task_events in chunk_results:
+            if launcher_cmd is not None:
+                self.launcher_cmd = launcher_cmd
+            for task_fields, time_data in task_events:
+                self._task_events.append((NFTaskHandler(*task_fields), time_data))
+
+    def __map_commands_to_tasks(self):
+        """Read tasks commands and map them to the task events."""
+        command_to_tasks = defaultdict(list)
+        # read all .command.sh files at once
+        # the same task may appear in the log several times: read each file once
+        to_read = {task_data.wd: task_data._cmd_path for task_data, _ in self._task_events
+                   if task_data.wd not in self._cmd_cache}
+        cmd_contents = _read_files(list(to_read.values()))
+        self._cmd_cache.update(zip(to_read.keys(), cmd_contents))
+        for task_data, time_data in self._task_events:
+            task_cmd = self._cmd_cache[task_data.wd]
+            if task_cmd is None:
+                # work directory was removed, nothing to map
                 continue
-            elif "[Task monitor] DEBUG n.processor.TaskPollingMonitor" in line:
-                # something related to one of tasks
-                time_data = line.split(">")[0].split("[Task monitor]")[0]
-                line_data = line.rstrip().split(">")[1].split("[")[1].rstrip("]")
-                fields = line_data.split("; ")
-                # TODO: can be implemented much nicer
-                task_id = None
-                task_name = None
-                task_status = None
-                task_exit = None
-                task_wd = None
-                for field in fields:
-                    key, value = field.split(": ")
-                    if key == "id":
-                        task_id = value
-                    elif key == "name":
-                        task_name = value
-                    elif key == "status":
-                        task_status = value
-                    elif key == "exit":
-                        task_exit = value
-                    elif key == "workDir":
-                        task_wd = value
-                task_data = NFTaskHandler(task_id, task_name, task_status, task_exit, task_wd)
-                task_cmd = task_data.get_cmd()
-                self.command_to_tasks[task_cmd] = (task_data, time_data)
-        f.close()
+            command_to_tasks[task_cmd].append((task_data, time_data))
+        return command_to_tasks
 
     def __repr__(self):
         """Repr."""
@@ -162,28 +372,59 @@ class NextflowTime:
             raise ValueError(err_msg)
         # well, time to read the logs
         self.year = None
-        self.__extract_year()
         self.start_time = None
         self.end_time = None
-        self.job_to_data = defaultdict(dict)
-        self.__extract_time_data()
-
-    def __extract_year(self):
-        """Extract year."""
-        f = open(self.nextflow_log_file, "r")
-        for line in f:
-            if line.startswith("  Created:"):
+        # jobs data as structure of arrays: i-th element of each refers to the same job
+        self._job_ids = []
+        self._job_starts = array("q")  # job start times in microseconds
+        self._job_durations = array("q")  # job runtimes in microseconds
+        self._job_rcs = []
+        # filled on the first job_to_data access
+        self._job_to_data = None
+        with _map_log_file(self.nextflow_log_file) as log_data:
+            self.__extract_time_data(log_data)
+
+    def __extract_time_data(self, log_data):
+        """Extract time-related data from logs.
+
+        The year is mentioned only once, after the first events,
+        so the timestamps are converted to datetime after the scan.
+        """
+        # job id -> [start time, end time, return code]
+        job_slots = {}
+        start_time = None
+        end_time = None
+
+        for event in NF_LOG_EVENT_RE.finditer(log_data):
+            event_type = event.lastgroup
+            if event_type == NF_CREATED_EVENT:
                 # workaround to get year =)
                 # not specified in Mon-Day Hr-Min-Sec.Nanosec
 
                 # TODO: consider the case if the jobs started at the end of a year
                 # and finished on the 1st of January
                 # we will get jobs running > 1 year =)
-                _date_str = line.rstrip().split()[1]
-                _, _, _yyyy = _date_str.split("-")
-                self.year = int(_yyyy)
-                break
-        f.close()
+                if self.year is None:
+                    self.year = int(event.group("year"))
+                continue
+            # raw bytes, decoded only once per distinct timestamp by __get_dt_obj
+            event_time = event.group("date", "time")
+
+            if event_type == NF_MONITOR_EVENT:
+                # job id: first 8 chars of the last two work dir components
+                work_dir = event.group("work_dir")
+                job_id = b"".join(work_dir.rsplit(b"/", 2)[-2:])[:8].decode()
+                slots = job_slots.setdefault(job_id, [None, None, None])
+                slots[1] = event_time
+                slots[2] = int(event.group("exit"))
+            elif event_type == NF_SUBMITTER_EVENT:
+                job_id = event.group("submitted").decode().replace("/", "")
+                job_slots.setdefault(job_id, [None, None, None])[0] = event_time
+            elif event_type == NF_LAUNCHER_EVENT:
+                start_time = event_time
+            elif event_type == NF_GOODBYE_EVENT:
+                end_time = event_time
+
         # sanity check
         if self.year is None:
             # was not specified:
@@ -192,65 +433,54 @@ class NextflowTime:
                        "The line startswith:\n  Created:\nis absent")
             raise ValueError(err_msg)
 
+        # now we can convert the timestamps
+        self.start_time = self.__get_dt_obj(self.year, *start_time) if start_time else None
+        self.end_time = self.__get_dt_obj(self.year, *end_time) if end_time else None
+        self.__save_job_stats_arr(job_slots)
 
-    def __extract_time_data(self):
-        """Extract time-related data from logs."""
-        f = open(self.nextflow_log_file, "r")
-        job_to_start = {}
-        job_to_end = {}
-        job_to_stat = {}
+    @property
+    def job_to_data(self):
+        """Job id -> dict with start, end, rc and tot (runtime) keys.
 
-        for line in f:
-            line_tokens = line.rstrip().split()
-            if line.startswith("  "):
-                # Version, Runtime, etc data
-                # starts with two spaces
-                # no time data here
-                continue
-            _date_str = line_tokens[0]
-            _time_str = line_tokens[1]
-            
-            if NF_CLI_LAUNCHER_TAG in line_tokens:
-                self.start_time = self.__get_dt_obj(self.year, _date_str, _time_str)
-                continue
-            elif NF_EXE_COMPLETE_TAG in line_tokens:
-                print()
-                self.end_time = self.__get_dt_obj(self.year, _date_str, _time_str)
-                continue
-            elif NF_TASK_SUBMITTER_TAG in line and NF_SESSION_TAG in line_tokens:
-                job_id = line_tokens[7][1:-1].replace('/', "")
-                job_start_time = self.__get_dt_obj(self.year, _date_str, _time_str)
-                job_to_start[job_id] = job_start_time
-                continue
-            elif NF_TASK_MONITOR_TAG in line:
-                full_job_id = "".join(line_tokens[-1].split("/")[-2:]).rstrip("]")
-                job_id = full_job_id[:8]
-                job_end_time = self.__get_dt_obj(self.year, _date_str, _time_str)
-                job_to_end[job_id] = job_end_time
-                exit_stat_index = line_tokens.index("exit:") + 1
-                exit_stat = int(line_tokens[exit_stat_index].rstrip(";"))
-                job_to_stat[job_id] = exit_stat
-        f.close()
-
-        self.__save_job_stats_arr(job_to_start, job_to_end, job_to_stat)
-
-    def __save_job_stats_arr(self, j_to_start, j_to_end, j_to_rc):
-        """Save jobs data to self.job_to_data array."""
-        id_keys = set(j_to_start.keys()).intersection(j_to_end.keys()).intersection(j_to_rc.keys())
-        missing_j_to_s = [k for k in j_to_start.keys() if k not in id_keys]
-        missing_j_to_e = [k for k in j_to_end.keys() if k not in id_keys]
-        missing_j_to_r = [k for k in j_to_rc.keys() if k not in id_keys]
-        if len(missing_j_to_s) > 0:
-            raise ValueError(f"Cannot find start times for jobs:\n{missing_j_to_s}")
-        elif len(missing_j_to_e) > 0:
-            raise ValueError(f"Cannot find end times for jobs:\n{missing_j_to_e}")
-        elif len(missing_j_to_r) > 0:
-            raise ValueError(f"Cannot find return codes for jobs:\n{missing_j_to_r}")
-        for id_key in id_keys:
-            self.job_to_data[id_key]["start"] = j_to_start[id_key]
-            self.job_to_data[id_key]["end"] = j_to_end[id_key]
-            self.job_to_data[id_key]["rc"] = j_to_rc[id_key]
-            self.job_to_data[id_key]["tot"] = j_to_end[id_key] - j_to_start[id_key]
+        Built from the jobs arrays on the first access only.
+        """
+        if self._job_to_data is None:
+            job_to_data = defaultdict(dict)
+            for job_id, start, duration, rc in zip(
+                self._job_ids, self._job_starts, self._job_durations, self._job_rcs
+            ):
+                start_time = NF_TIME_ORIGIN + datetime.timedelta(microseconds=start)
+                job_time = datetime.timedelta(microseconds=duration)
+                job_to_data[job_id] = {
+                    "start": start_time, "end": start_time + job_time, "rc": rc, "tot": job_time
+                }
+            self._job_to_data = job_to_data
+        return self._job_to_data
+
+    def __save_job_stats_arr(self, job_slots):
+        """Save jobs data to the jobs arrays.
+
+        job_slots: job id -> [start time, end time, return code],
+        times are (date, time) bytes pairs.
+        """
+        missing = ([], [], [])
+        for job_id, slots in job_slots.items():
+            for num, value in enumerate(slots):
+                if value is None:
+                    missing[num].append(job_id)
+        missing_start, missing_end, missing_rc = missing
+        if len(missing_start) > 0:
+            raise ValueError(f"Cannot find start times for jobs:\n{missing_start}")
+        elif len(missing_end) > 0:
+            raise ValueError(f"Cannot find end times for jobs:\n{missing_end}")
+        elif len(missing_rc) > 0:
+            raise ValueError(f"Cannot find return codes for jobs:\n{missing_rc}")
+        for job_id, (start, end, rc) in job_slots.items():
+            start = self.__get_time_stamp(self.year, *start)
+            self._job_ids.append(job_id)
+            self._job_starts.append(start)
+            self._job_durations.append(self.__get_time_stamp(self.year, *end) - start)
+            self._job_rcs.append(rc)
 
     # TODO: think about proper function naming
     def total_runtime(self):
@@ -259,34 +489,34 @@ class NextflowTime:
         return tot_time
     
     def __get_jobs_times(self, only_failed=False, only_success=False):
-        """Get array of job-related timedeltas according to filters."""
+        """Get array of job runtimes (in microseconds) according to filters."""
         if only_failed is True and only_success is True:
             err_msg = ("NextflowTime: only_failed and only_success cannot be True\n"
                        "at the same time, please select only one (or none)")
             raise ValueError(err_msg)
-        job_times = []
-        job_ids = []
-        for k, v in self.job_to_data.items():
-            # just a few filters
-            if only_failed and v["rc"] == 0:
-                continue
-            elif only_success and v["rc"] != 0:
-                continue
-            job_times.append(v["tot"])
-            job_ids.append(k)
+        # just a few filters
+        if only_failed:
+            selected = [num for num, rc in enumerate(self._job_rcs) if rc != 0]
+        elif only_success:
+            selected = [num for num, rc in enumerate(self._job_rcs) if rc == 0]
+        else:
+            return self._job_durations, self._job_ids
+        job_times = array("q", [self._job_durations[num] for num in selected])
+        job_ids = [self._job_ids[num] for num in selected]
         # if no items: warning?
         return job_times, job_ids
 
     def total_cpu_time(self, only_failed=False, only_success=False):
         """Sum of all jobs runtime."""
         job_times, _ = self.__get_jobs_times(only_failed=only_failed, only_success=only_success)
-        job_sum_time = sum(job_times, datetime.timedelta())
+        # sum plain ints, not timedelta objects
+        job_sum_time = datetime.timedelta(microseconds=sum(job_times))
         return job_sum_time
     
     def average_job_runtime(self, only_failed=False, only_success=False):
         """Get average job runtime."""
         job_times, _ = self.__get_jobs_times(only_failed=only_failed, only_success=only_success)
-        job_sum_time = sum(job_times, datetime.timedelta())
+        job_sum_time = datetime.timedelta(microseconds=sum(job_times))
         ave_job_time = job_sum_time / len(job_times)
         return ave_job_time
 
@@ -303,35 +533,36 @@ class NextflowTime:
         if len(job_times) == 0:
             # TODO: warning message?
             return (None, None)
-        sorted_by_len = sorted(zip(job_times, job_ids), key=lambda x: x[0], reverse=True)
-        return (sorted_by_len[0])
+        longest_num = max(range(len(job_times)), key=job_times.__getitem__)
+        return (datetime.timedelta(microseconds=job_times[longest_num]), job_ids[longest_num])
 
 
     @staticmethod
     def __get_dt_obj(year, date_str, time_str):
-        """Get python datetime object from string and time.
-        
-        Likely there is a better and less wordy solution.
-        """
-        mon_str, day_str = date_str.split("-")
+        """Get python datetime object from date and time bytes."""
+        time_stamp = NextflowTime.__get_time_stamp(year, date_str, time_str)
+        return NF_TIME_ORIGIN + datetime.timedelta(microseconds=time_stamp)
+
+    @staticmethod
+    def __get_time_stamp(year, date_str, time_str):
+        """Get microseconds since NF_TIME_ORIGIN from date and time bytes."""
+        sec_str, _, ms_str = time_str.partition(b".")
+        # many events share the same second: that part is parsed once and cached
+        return NextflowTime.__get_second_stamp(year, date_str, sec_str) + int(ms_str)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def __get_second_stamp(year, date_str, time_str):
+        """Get microseconds since NF_TIME_ORIGIN from date and time (up to seconds) bytes."""
+        mon_str, day_str = date_str.decode().split("-", 1)
         month = NF_MON_TO_NUM.get(mon_str)
         if month is None:  # is it even possible? Surely
             err_msg = f"Error! Unknown month symbol: {mon_str}"
             raise ValueError(err_msg)
-        day = int(day_str)
-
-        hour_str, min_str, sec_ms_str = time_str.split(":")
-        hour = int(hour_str)
-        minute = int(min_str)
-        second_str, ms_str = sec_ms_str.split(".")
-        second = int(second_str)
-        milisecond = int(ms_str)
-
-        date = datetime.date(year, month, day)
-        time = datetime.time(hour, minute, second, milisecond)
-
-        event_datetime = datetime.datetime.combine(date, time)
-        return event_datetime
+        hour_str, min_str, second_str = time_str.split(b":", 2)
+        second = datetime.datetime(year, month, int(day_str),
+                                   int(hour_str), int(min_str), int(second_str))
+        return (second - NF_TIME_ORIGIN) // ONE_MICROSECOND
 
 
 
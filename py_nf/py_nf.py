@@ -1,15 +1,19 @@
 """Py-nf core functionality."""
 import re
-import subprocess
 import os
 import sys
 import time
 from datetime import datetime as dt
-from collections import Iterable
 import shutil
 import inspect
+import itertools
 import warnings
 from .version import __version__
+from .utils import _which_cached
+from .utils import _joblist_to_list
+from .utils import OPEN_DIR_FD_SUPPORTED
+# asyncio, subprocess, concurrent.futures and hashlib are imported
+# in the methods which need them: importing py_nf stays fast
 
 
 __author__ = "Bogdan Kirilenko"
@@ -43,17 +47,82 @@ RETRY_INCREASE_MEMORY_PARAM = "retry_increase_mem"
 RETRY_INCREASE_TIME_PARAM = "retry_increase_time"
 PARTITION_PARAM = "partition"
 CLUSTER_OPTIONS_PARAM = "cluster_options"
+CLUSTER_SIZE_PARAM = "cluster_size"
+DEDUPE_JOBS_PARAM = "dedupe_jobs"
+VALIDATE_JOBLIST_PARAM = "validate_joblist"
+SPLIT_CONFIG_PARAM = "split_config"
+CAPTURE_OUTPUT_PARAM = "capture_output"
 NEXTFLOW_LOG_FILENAME = ".nextflow.log"
 
 DEFAULT_SCRIPT_NAME = "script.nf"
 DEFAULT_CONFIG_NAME = "config.nf"
-
-AVAILABLE_MEMORY_UNITS = {"B", "KB", "MB", "GB", "TB"}
-AVAILABLE_TIME_UNITS = {"ms", "milli", "millis",
-                        "s", "sec", "seconds",
-                        "m", "min", "minute", "minutes",
-                        "h", "hour", "hours",
-                        "d", "day", "days"}
+JOBLIST_FILENAME = "joblist.txt"
+# templates of generated nextflow files
+NF_CONFIG_TEMPLATE = """{executor_options}// automatically generated config file for project {project_name}
+// at: {now}
+process {{
+    executor = '{executor}'
+    queue = '{queue}'
+    memory = '{memory}'
+    time = '{time}'
+    cpus = '{cpus}'
+{label_blocks}}}
+"""
+# with label config extensions
+RETRY_INCREASE_MEM_LABEL = "retry_increase_mem"
+RETRY_INCREASE_TIME_LABEL = "retry_increase_time"
+NF_RETRY_INCREASE_MEM_BLOCK = """
+    withLabel: {label} {{
+        memory = {{{memory} * task.attempt}}
+        errorStrategy = 'retry'
+    }}
+"""
+NF_RETRY_INCREASE_TIME_BLOCK = """
+    withLabel: {label} {{
+        time = {{{time} * task.attempt}}
+        errorStrategy = 'retry'
+    }}
+"""
+# process settings, if written to the script directly
+NF_INLINE_DIRECTIVES_TEMPLATE = """    executor '{executor}'
+    queue '{queue}'
+    memory {memory}
+    time {time}
+    cpus '{cpus}'
+"""
+NF_SCRIPT_TEMPLATE = """// automatically generated script for project {project_name}
+// at: {now}
+joblist_path = '{joblist_path}'
+joblist = file(joblist_path)
+lines = Channel.from(joblist.readLines())
+
+process execute_jobs {{
+    errorStrategy '{error_strategy}'
+    maxRetries {max_retries}
+
+{optional_directives}
+    input:
+    val line from lines
+
+    "${{line}}"
+}}
+"""
+
+# joblists might be huge, write them with a large buffer
+JOBLIST_BUFFER_SIZE = 1 << 20
+# number of joblist lines encoded and written at once
+JOBLIST_WRITE_BATCH = 8192
+# digest of the last written joblist, to skip writing the same joblist again
+JOBLIST_HASH_FILENAME = ".joblist.hash"
+
+AVAILABLE_MEMORY_UNITS = frozenset({"B", "KB", "MB", "GB", "TB"})
+AVAILABLE_TIME_UNITS = frozenset({"ms", "milli", "millis",
+                                  "s", "sec", "seconds",
+                                  "m", "min", "minute", "minutes",
+                                  "h", "hour", "hours",
+                                  "d", "day", "days"})
+# PATH -> executor picked by pick_executor, local is never cached
+_PICKED_EXECUTOR_CACHE = {}
 
 class Nextflow:
     """Nextflow wrapper."""
@@ -78,38 +147,91 @@ class Nextflow:
         "tes": None,
     }
 
+    # list of acceptable parameters
+    params_list = frozenset({
+        EXECUTOR_PARAM,
+        NEXTFLOW_EXE_PARAM,
+        ERROR_STRATEGY_PARAM,
+        MAX_RETRIES_PARAM,
+        RETRY_INCREASE_MEMORY_PARAM,
+        RETRY_INCREASE_TIME_PARAM,
+        QUEUE_PARAM,
+        MEMORY_PARAM,
+        MEMORY_UNITS_PARAM,
+        TIME_PARAM,
+        TIME_UNITS_PARAM,
+        CPUS_PARAM,
+        EXECUTOR_QUEUE_SIZE_PARAM,
+        EXECUTOR_SUBMIT_RATE_LIMIT_PARAM,
+        REMOVE_LOGS_PARAM,
+        WD_PARAM,
+        PROJECT_NAME_PARAM,
+        NO_NF_CHECK_PARAM,
+        FORCE_REMOVE_LOGS_PARAM,
+        SWITCH_TO_LOCAL_PARAM,
+        VERBOSE,
+        CLUSTER_OPTIONS_PARAM,
+        CLUSTER_SIZE_PARAM,
+        DEDUPE_JOBS_PARAM,
+        VALIDATE_JOBLIST_PARAM,
+        SPLIT_CONFIG_PARAM,
+        CAPTURE_OUTPUT_PARAM,
+    })
+
+    # no per-instance __dict__
+    __slots__ = (
+        "verbosity_on",
+        "nextflow_exe",
+        "__nextflow_checked",
+        "executor",
+        "switch_to_local",
+        "error_strategy",
+        "max_retries",
+        "queue",
+        "memory",
+        "time",
+        "cpus",
+        "retry_increase_mem",
+        "retry_increase_time",
+        "executor_queuesize",
+        "executor_submit_rate_limit",
+        "remove_logs",
+        "force_remove_logs",
+        "wd",
+        "cluster_options",
+        "cluster_size",
+        "dedupe_jobs",
+        "validate_joblist",
+        "split_config",
+        "capture_output",
+        "stdout",
+        "stderr",
+        "project_name",
+        "project_dir",
+        "jobs_num",
+        "joblist_path",
+        "nextflow_script_path",
+        "nextflow_config_path",
+        "executed_with_success",
+        "executed_at",
+        "__process",
+        "__async_process",
+        "__status",
+        "__project_dir_fd",
+        "__output_reader",
+    )
+
     def __init__(self, **kwargs):
         """Init nextflow wrapper."""
         # TODO: proper documentation of course
-        # list of acceptable parameters
-        self.params_list = {
-            EXECUTOR_PARAM,
-            NEXTFLOW_EXE_PARAM,
-            ERROR_STRATEGY_PARAM,
-            MAX_RETRIES_PARAM,
-            RETRY_INCREASE_MEMORY_PARAM,
-            RETRY_INCREASE_TIME_PARAM,
-            QUEUE_PARAM,
-            MEMORY_PARAM,
-            MEMORY_UNITS_PARAM,
-            TIME_PARAM,
-            TIME_UNITS_PARAM,
-            CPUS_PARAM,
-            EXECUTOR_QUEUE_SIZE_PARAM,
-            EXECUTOR_SUBMIT_RATE_LIMIT_PARAM,
-            REMOVE_LOGS_PARAM,
-            WD_PARAM,
-            PROJECT_NAME_PARAM,
-            NO_NF_CHECK_PARAM,
-            FORCE_REMOVE_LOGS_PARAM,
-            SWITCH_TO_LOCAL_PARAM,
-            VERBOSE,
-            CLUSTER_OPTIONS_PARAM,
-        }
         self.verbosity_on = True if kwargs.get(VERBOSE) else False
         if kwargs.get(NEXTFLOW_EXE_PARAM):
             # in case if user provided a path to nextflow executable manually:
-            self.nextflow_exe = os.path.abspath(kwargs[NEXTFLOW_EXE_PARAM])
+            nextflow_exe = kwargs[NEXTFLOW_EXE_PARAM]
+            if os.path.isabs(nextflow_exe):
+                self.nextflow_exe = os.fspath(nextflow_exe)
+            else:
+                self.nextflow_exe = os.path.abspath(nextflow_exe)
         else:  # otherwise try default nextflow (must be in $PATH)
             self.nextflow_exe = NEXTFLOW_DEFAULT_EXE
         # check whether nextflow is installed and reachable
@@ -142,9 +264,26 @@ class Nextflow:
         # force_remove_logs will remove this anyway
         self.remove_logs = kwargs.get(REMOVE_LOGS_PARAM, False)
         self.force_remove_logs = kwargs.get(FORCE_REMOVE_LOGS_PARAM, False)
-        wd = os.getcwd()  # if we like to run nextflow from some specific directory
-        self.wd = kwargs.get(WD_PARAM, wd)
+        # if we like to run nextflow from some specific directory
+        self.wd = kwargs[WD_PARAM] if WD_PARAM in kwargs else os.getcwd()
         self.cluster_options = kwargs.get(CLUSTER_OPTIONS_PARAM, None)
+        # number of jobs to execute within a single nextflow task
+        self.cluster_size = kwargs.get(CLUSTER_SIZE_PARAM, 1)
+        if type(self.cluster_size) is not int or self.cluster_size < 1:
+            raise ValueError(f"Invalid {CLUSTER_SIZE_PARAM} parameter {self.cluster_size}, "
+                             f"must be a positive integer")
+        # execute identical jobs only once
+        self.dedupe_jobs = kwargs.get(DEDUPE_JOBS_PARAM, False)
+        # check that each job is a string, might be skipped for trusted joblists
+        self.validate_joblist = kwargs.get(VALIDATE_JOBLIST_PARAM, True)
+        # by default process settings are written to the script itself,
+        # separate config file is created only if requested or necessary
+        self.split_config = kwargs.get(SPLIT_CONFIG_PARAM, False)
+        # save nextflow stdout and stderr to self.stdout and self.stderr
+        # instead of passing them through
+        self.capture_output = kwargs.get(CAPTURE_OUTPUT_PARAM, False)
+        self.stdout = None
+        self.stderr = None
         self.__check_dir_exists(self.wd)
         self.project_name = None
         self.project_dir = None
@@ -156,48 +295,65 @@ class Nextflow:
         self.nextflow_config_path = None
         self.executed_with_success = None
         self.executed_at = "N/A"
+        # nextflow process started by submit() and its exit status
+        self.__process = None
+        # nextflow process awaited by execute_async()
+        self.__async_process = None
+        self.__status = None
+        # project directory descriptor, open while the project files are created
+        self.__project_dir_fd = None
+        # thread collecting the captured output of the submitted pipeline
+        self.__output_reader = None
 
         # show warnings if user provided not supported arguments
-        not_acceptable_args = set(kwargs.keys()).difference(self.params_list)
+        not_acceptable_args = kwargs.keys() - self.params_list
         for elem in not_acceptable_args:
             # TODO: maybe crash then?
             msg = f"py_nf: Argument {elem} is not supported."
             warnings.warn(msg)
         if len(not_acceptable_args) > 0:
             warnings.warn("### Please find a list of supported options in the README.md")
-        self.__v(f"Initiated py_nf with the following params:\n{self.__repr__()}")
+        if self.verbosity_on:
+            self.__v(f"Initiated py_nf with the following params:\n{self!r}")
 
     def __set_memory(self, quantity, units):
         """Get memory parameter as a string."""
         if units not in AVAILABLE_MEMORY_UNITS:
             raise ValueError(f"Invalid {MEMORY_UNITS_PARAM} parameter {units}, "
-                             f"please select one of these:\n{AVAILABLE_MEMORY_UNITS}")
+                             f"please select one of these:\n{', '.join(sorted(AVAILABLE_MEMORY_UNITS))}")
         return f"{quantity}.{units}"
     
     def __set_time(self, quantity, units):
         """Get memory parameter as a string."""
         if units not in AVAILABLE_TIME_UNITS:
             raise ValueError(f"Invalid {TIME_UNITS_PARAM} parameter {units}, "
-                             f"please select one of these:\n{AVAILABLE_TIME_UNITS}")
+                             f"please select one of these:\n{', '.join(sorted(AVAILABLE_TIME_UNITS))}")
         return f"{quantity}.{units}"
 
     def __v(self, msg):
-        """Verbosity message."""
-        sys.stderr.write(f"{msg}\n") if self.verbosity_on else None
+        """Verbosity message.
+
+        Messages that are expensive to build, like the ones calling
+        inspect.currentframe(), should be guarded with if self.verbosity_on.
+        """
+        if self.verbosity_on:
+            sys.stderr.write(f"{msg}\n")
 
     def set_project_name_and_dir(self, project_name=None):
         """Set project name and directory.
 
         Default value: nextflow_project_at_$timestamp.
         """
-        self.__v(
-            f"Calling {inspect.currentframe()}\nwith params: project_name={project_name}"
-        )
+        if self.verbosity_on:
+            self.__v(
+                f"Calling {inspect.currentframe()}\nwith params: project_name={project_name}"
+            )
         if project_name is None:
             # set default project name then
             timestamp = self._get_tmstmp()
             project_name = f"nextflow_project_at_{timestamp}"
         self.project_name = project_name
+        # absolute and normalized: paths of project files are just joined to it
         self.project_dir = os.path.abspath(os.path.join(self.wd, self.project_name))
 
     def __check_executor(self):
@@ -208,7 +364,8 @@ class Nextflow:
         https://www.nextflow.io/docs/latest/executor.html
         for details.
         """
-        self.__v(f"Calling {inspect.currentframe()}; self.executor={self.executor}")
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}; self.executor={self.executor}")
         if self.executor == LOCAL:
             # local executor must be reachable on any machine
             return True
@@ -216,7 +373,7 @@ class Nextflow:
         # each executor requires some binary to be accessible
         # for instance, slurm requires sbatch and lsf needs bsub
         # TODO: handle ignite, kubernetes, awsbatch, tes and google-lifesciences, see issue #2
-        if self.executor not in self.executor_to_depend.keys():
+        if self.executor not in self.executor_to_depend:
             msg = f"Executor {self.executor} is not supported, abort"
             raise NotImplementedError(msg)
         # we have a supported executor, need to check whether the required
@@ -225,7 +382,7 @@ class Nextflow:
         if depend_exe is None:
             # no way to check, just return True -> let the nextflow and user to figure this out
             return True
-        depend_exists = shutil.which(depend_exe)
+        depend_exists = _which_cached(depend_exe)
         if depend_exists:
             # this is fine, let's go further
             return True
@@ -249,22 +406,25 @@ class Nextflow:
         raise ValueError(err_msg)
 
     def __check_nextflow(self):
-        """Check that nextflow is installed."""
-        self.__v(
-            f"Calling {inspect.currentframe()}; self.nextflow_exe={self.nextflow_exe}"
-        )
-        self.__nextflow_checked = True
-        cmd = f"{self.nextflow_exe} -v"
-        nf_here = shutil.which(self.nextflow_exe)
+        """Check that nextflow is installed.
+
+        Only looks the executable up: running nextflow -v would cost
+        a JVM start-up for each Nextflow instance.
+        """
+        if self.verbosity_on:
+            self.__v(
+                f"Calling {inspect.currentframe()}; self.nextflow_exe={self.nextflow_exe}"
+            )
+        nf_here = _which_cached(self.nextflow_exe)
         if nf_here:
+            self.__nextflow_checked = True
             return True
         err_msg = (
-            f"Nextflow installation not found."
-            f"Command {cmd} failed. Please find nextflow installation guide "
+            f"Nextflow installation not found: "
+            f"{self.nextflow_exe} is not an executable. Please find nextflow installation guide "
             f"here: https://www.nextflow.io/"
         )
-        if nf_here is None:
-            raise ChildProcessError(err_msg)
+        raise ChildProcessError(err_msg)
 
     @staticmethod
     def __check_dir_exists(directory):
@@ -272,124 +432,306 @@ class Nextflow:
         if not os.path.isdir(directory):
             raise OSError(f"Error! Directory {directory} does not exist!")
 
-    def __create_config_file(self, config_exists=False):
-        self.__v(f"Calling {inspect.currentframe()}")
+    def __create_config_file(self, now, config_exists=False):
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}")
         if config_exists:
             # in this case no need to create any additional config files
             return
-        self.nextflow_config_path = os.path.abspath(
-            os.path.join(self.project_dir, DEFAULT_CONFIG_NAME)
-        )
-        now = dt.now().isoformat()
-        f = open(self.nextflow_config_path, "w")
+        self.nextflow_config_path = os.path.join(self.project_dir, DEFAULT_CONFIG_NAME)
 
+        executor_options = []
         if self.executor_queuesize:
-            f.write(f"executor.queueSize = {self.executor_queuesize}\n")
+            executor_options.append(f"executor.queueSize = {self.executor_queuesize}\n")
         if self.executor_submit_rate_limit:
-            f.write(f"executor.submitRateLimit = {self.executor_submit_rate_limit}")
-
-        f.write(
-            f"// automatically generated config file for project {self.project_name}\n"
-        )
+            executor_options.append(f"executor.submitRateLimit = {self.executor_submit_rate_limit}\n")
 
         # TODO: depending on executor parameters the list of opts might differ
-        f.write(f"// at: {now}\n")
-        f.write("process {\n")
-        f.write(f"    executor = '{self.executor}'\n")
-        f.write(f"    queue = '{self.queue}'\n")
-        f.write(f"    memory = '{self.memory}'\n")
-        f.write(f"    time = '{self.time}'\n")
-        f.write(f"    cpus = '{self.cpus}'\n")
-
-                # with label config extensions
+        label_blocks = []
         if self.retry_increase_mem:
             # add extension to increase memory each time pipeline fails
-            f.write("\n")
-            f.write("    withLabel: retry_increase_mem {\n")
-            f.write(f"        memory = {{{self.memory} * task.attempt}}\n")
-            f.write(f"        errorStrategy = 'retry'\n")
-            f.write("    }\n")
-
+            label_blocks.append(NF_RETRY_INCREASE_MEM_BLOCK.format(
+                label=RETRY_INCREASE_MEM_LABEL, memory=self.memory
+            ))
         if self.retry_increase_time:
             # add extension to increase time each time pipeline fails
-            f.write("\n")
-            f.write("    withLabel: retry_increase_time {\n")
-            f.write(f"        time = {{{self.time} * task.attempt}}\n")
-            f.write(f"        errorStrategy = 'retry'\n")
-            f.write("    }\n")
-
-        f.write("}\n")
-
-        f.close()
+            label_blocks.append(NF_RETRY_INCREASE_TIME_BLOCK.format(
+                label=RETRY_INCREASE_TIME_LABEL, time=self.time
+            ))
+
+        config = NF_CONFIG_TEMPLATE.format(
+            executor_options="".join(executor_options),
+            project_name=self.project_name,
+            now=now,
+            executor=self.executor,
+            queue=self.queue,
+            memory=self.memory,
+            time=self.time,
+            cpus=self.cpus,
+            label_blocks="".join(label_blocks),
+        )
+        config_path = self.__get_project_file_path(DEFAULT_CONFIG_NAME)
+        with open(config_path, "w", opener=self.__project_file_opener) as f:
+            f.write(config)
         self.__v(f"Created config file at {self.nextflow_config_path}")
 
-    def __create_nf_script(self):
-        """Create nextflow script and config file"""
-        self.__v(f"Calling {inspect.currentframe()}")
-        self.nextflow_script_path = os.path.abspath(
-            os.path.join(self.project_dir, DEFAULT_SCRIPT_NAME)
-        )
+    def __create_nf_script(self, now, inline_config=False):
+        """Create nextflow script.
 
-        # write config file
-        now = dt.now().isoformat()
+        If inline_config, process settings go to the script as directives.
+        """
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}")
+        self.nextflow_script_path = os.path.join(self.project_dir, DEFAULT_SCRIPT_NAME)
 
-        # write script
-        f = open(self.nextflow_script_path, "w")
-        f.write(f"// automatically generated script for project {self.project_name}\n")
-        f.write(f"// at: {now}\n")
-        f.write(f"joblist_path = '{self.joblist_path}'\n")
-        f.write(f"joblist = file(joblist_path)\n")
-        f.write(f"lines = Channel.from(joblist.readLines())\n\n")
-        f.write("process execute_jobs {\n")
-        f.write(f"    errorStrategy '{self.error_strategy}'\n")
-        f.write(f"    maxRetries {self.max_retries}\n")
-        f.write("\n")
         # optional parameters:
-        f.write(f"    clusterOptions \"{self.cluster_options}\"\n") if self.cluster_options else None
-        f.write(f"    label 'retry_increasing_mem'\n") if self.retry_increase_mem is True else None
-        f.write(f"    label 'retry_increase_time'\n") if self.retry_increase_time is True else None
-        f.write("\n")
-        # calling the jobs itself:
-        f.write("    input:\n")
-        f.write("    val line from lines\n\n")
-        f.write('    "${line}"\n')
-        f.write("}\n")
-        f.close()
+        optional_directives = []
+        error_strategy = self.error_strategy
+        if inline_config:
+            # the same settings the config file would contain
+            # increasing resources on retry require the retry error strategy
+            retry_increase = self.retry_increase_mem or self.retry_increase_time
+            optional_directives.append(NF_INLINE_DIRECTIVES_TEMPLATE.format(
+                executor=self.executor,
+                queue=self.queue,
+                memory=f"{{ {self.memory} * task.attempt }}" if self.retry_increase_mem else f"'{self.memory}'",
+                time=f"{{ {self.time} * task.attempt }}" if self.retry_increase_time else f"'{self.time}'",
+                cpus=self.cpus,
+            ))
+            error_strategy = "retry" if retry_increase else error_strategy
+        if self.cluster_options:
+            optional_directives.append(f"    clusterOptions \"{self.cluster_options}\"\n")
+        if self.retry_increase_mem is True and not inline_config:
+            optional_directives.append(f"    label '{RETRY_INCREASE_MEM_LABEL}'\n")
+        if self.retry_increase_time is True and not inline_config:
+            optional_directives.append(f"    label '{RETRY_INCREASE_TIME_LABEL}'\n")
+
+        script = NF_SCRIPT_TEMPLATE.format(
+            project_name=self.project_name,
+            now=now,
+            joblist_path=self.joblist_path,
+            error_strategy=error_strategy,
+            max_retries=self.max_retries,
+            optional_directives="".join(optional_directives),
+        )
+        script_path = self.__get_project_file_path(DEFAULT_SCRIPT_NAME)
+        with open(script_path, "w", opener=self.__project_file_opener) as f:
+            f.write(script)
         self.__v(f"Created script at {self.nextflow_script_path}")
 
     def execute(self, joblist, config_file=None):
         """Execute jobs in parallel."""
-        self.__v(f"Calling {inspect.currentframe()}")
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}")
+        self.submit(joblist, config_file=config_file)
+        try:
+            return self.wait_for_completion()
+        except BaseException:
+            # like subprocess.call: do not leave nextflow running if the wait is interrupted
+            self.__kill_process()
+            raise
+
+    def __kill_process(self):
+        """Kill the submitted nextflow process, if any."""
+        if self.__process is None:
+            return
+        self.__process.kill()
+        self.__finish_pipeline(self.__process.wait())
+
+    def __check_not_running(self):
+        """Raise an error if a pipeline of this instance is still running."""
+        if self.__process is not None or self.__async_process is not None:
+            raise RuntimeError(
+                f"Error! Pipeline {self.project_name} is already running, "
+                f"wait for its completion first"
+            )
+
+    def submit(self, joblist, config_file=None):
+        """Start jobs execution and return immediately.
+
+        Use poll() or wait_for_completion() to get the pipeline status.
+        """
+        import subprocess
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}")
+        self.__check_not_running()
+        cmd, env = self.__prepare_pipeline(joblist, config_file)
+        if not self.capture_output:
+            self.__process = subprocess.Popen(cmd, cwd=self.project_dir, env=env)
+            return
+        import threading
+        # bufsize=-1: fully buffered pipes, unbuffered ones cost a syscall per read
+        self.__process = subprocess.Popen(
+            cmd,
+            cwd=self.project_dir,
+            env=env,
+            bufsize=-1,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # pipes are drained in background: nextflow would hang on a full pipe otherwise
+        self.__output_reader = threading.Thread(
+            target=self.__read_output, args=(self.__process,), daemon=True
+        )
+        self.__output_reader.start()
+
+    def __read_output(self, process):
+        """Collect output of the nextflow process."""
+        stdout, stderr = process.communicate()
+        self.stdout = stdout.decode(errors="replace")
+        self.stderr = stderr.decode(errors="replace")
+
+    def poll(self):
+        """Check whether the submitted pipeline is finished.
+
+        Return None if the pipeline is still running, otherwise
+        the same status as execute() does.
+        """
+        if self.__process is None:
+            return self.__status
+        rc = self.__process.poll()
+        if rc is None:
+            return None
+        return self.__finish_pipeline(rc)
+
+    def wait_for_completion(self, timeout=None):
+        """Wait for the submitted pipeline to finish.
+
+        Return None if the pipeline is still running after timeout seconds,
+        otherwise the same status as execute() does.
+        """
+        import subprocess
+        if self.__process is None:
+            return self.__status
+        try:
+            rc = self.__process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+        return self.__finish_pipeline(rc)
+
+    async def execute_async(self, joblist, config_file=None):
+        """Execute jobs in parallel, asyncio version of execute().
+
+        Allows a single event loop to drive several pipelines at once.
+        """
+        import asyncio
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}")
+        self.__check_not_running()
+        cmd, env = self.__prepare_pipeline(joblist, config_file)
+        if not self.capture_output:
+            proc = await asyncio.create_subprocess_exec(*cmd, cwd=self.project_dir, env=env)
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=self.project_dir,
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        self.__async_process = proc
+        try:
+            # without pipes communicate() just waits for the process
+            stdout, stderr = await proc.communicate()
+        except BaseException:
+            # a cancelled task must not leave nextflow running
+            if proc.returncode is None:
+                proc.kill()
+            self.__finish_pipeline(await proc.wait())
+            raise
+        if self.capture_output:
+            self.stdout = stdout.decode(errors="replace")
+            self.stderr = stderr.decode(errors="replace")
+        return self.__finish_pipeline(proc.returncode)
+
+    @staticmethod
+    def gather(runs):
+        """Execute several pipelines concurrently, return their statuses.
+
+        runs: iterable of (Nextflow instance, joblist) pairs.
+        Starts an event loop, so it cannot be called from a running one:
+        await execute_async() calls there instead.
+        """
+        import asyncio
+
+        async def execute_all():
+            return await asyncio.gather(*(nf.execute_async(joblist) for nf, joblist in runs))
+        return asyncio.run(execute_all())
+
+    def __prepare_pipeline(self, joblist, config_file):
+        """Create project files, return the command (argv list) to execute and its environment."""
         self.__v(f"self.project_dir = {self.project_dir}")
 
         if not self.__nextflow_checked:
             self.__check_nextflow()
-        os.mkdir(self.project_dir) if not os.path.isdir(self.project_dir) else None
+        os.makedirs(self.project_dir, exist_ok=True)
 
         _config_exists = config_file is not None
-        self.__generate_joblist_file(joblist)
-        self.__create_config_file(config_exists=_config_exists)
-        self.__create_nf_script()
+        # executor.* options can be set in a config file only
+        _executor_options = self.executor_queuesize or self.executor_submit_rate_limit
+        inline_config = not (self.split_config or _config_exists or _executor_options)
+        self.joblist_path = os.path.join(self.project_dir, JOBLIST_FILENAME)
+        # the same creation time for all project files
+        now = dt.now().isoformat()
+        # a huge joblist takes a while to write: create the other files meanwhile
+        from concurrent.futures import ThreadPoolExecutor
+        if OPEN_DIR_FD_SUPPORTED:
+            # the project dir path is resolved once for all project files
+            self.__project_dir_fd = os.open(self.project_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                joblist_written = executor.submit(self.__generate_joblist_file, joblist)
+                if inline_config:
+                    # one file less to write and for nextflow to read
+                    self.nextflow_config_path = None
+                else:
+                    self.__create_config_file(now, config_exists=_config_exists)
+                self.__create_nf_script(now, inline_config=inline_config)
+                joblist_written.result()  # re-raises joblist errors, if any
+        finally:
+            if self.__project_dir_fd is not None:
+                os.close(self.__project_dir_fd)
+                self.__project_dir_fd = None
         if config_file:  # in case user wants to execute with pre-defined config file
-            self.nextflow_script_path = config_file
+            self.nextflow_config_path = os.path.abspath(config_file)
 
-        # TODO: add detach process feature (useful if user wants to execute several pipelines at once)
-        
         ### Important, recent versions of nextflow use DSL2. The py_nf library runs with DSL1 only ###
         # TODO: adapt for DSL2 version
         # Temporary solution for now: force DSL1 use
-        os.environ["NXF_DEFAULT_DSL"] = "1"
-
-        cmd = f"{self.nextflow_exe} {self.nextflow_script_path} -c {self.nextflow_config_path}"
+        # for the nextflow process only, the caller's environment is not modified
+        env = {**os.environ, "NXF_DEFAULT_DSL": "1"}
+
+        # run nextflow directly, without an intermediate shell
+        # the executable is resolved once (cached per PATH), execve skips the PATH search
+        nextflow_exe = _which_cached(self.nextflow_exe) or self.nextflow_exe
+        cmd = [nextflow_exe, self.nextflow_script_path]
+        if self.nextflow_config_path:
+            cmd.extend(["-c", self.nextflow_config_path])
         self.executed_at = self._get_tmstmp()
-        self.__v(f"Executing command:\n{cmd}")
-        rc = subprocess.call(cmd, shell=True, cwd=self.project_dir)
+        self.executed_with_success = None
+        self.__status = None
+        self.stdout = None
+        self.stderr = None
+        self.__v(f"Executing command:\n{' '.join(cmd)}")
+        return cmd, env
+
+    def __finish_pipeline(self, rc):
+        """Clean up after nextflow process exited, return pipeline status."""
+        self.__process = None
+        self.__async_process = None
+        if self.__output_reader is not None:
+            # the process exited, the rest of the output is about to be read
+            self.__output_reader.join()
+            self.__output_reader = None
         # remove project files logic: if pipeline fails, remove_logs keep all files
         # in case of force_remove_logs we delete them anyway
         remove_files = self.force_remove_logs or (self.remove_logs and rc == 0)
         if remove_files:
             self.__v(f"Removing temporary files at {self.project_dir}")
-            shutil.rmtree(self.project_dir) if os.path.isdir(self.project_dir) else None
+            try:
+                shutil.rmtree(self.project_dir)
+            except FileNotFoundError:
+                pass
 
         # TODO: maybe add a param to not kill program if nf pipe fails (kill by default)
         if rc != 0:
@@ -403,31 +745,94 @@ class Nextflow:
             )
             warnings.warn(msg)
             self.executed_with_success = False
-            return 1
+            self.__status = 1
         else:  # everything is fine
             self.__v("Nextflow pipeline executed successfully")
             self.executed_with_success = True
-            return 0
+            self.__status = 0
+        return self.__status
 
     def __generate_joblist_file(self, joblist):
         """Generate joblist file.
 
         Joblist expected type: list of strings.
         """
-        self.__v(f"Calling {inspect.currentframe()}")
-        self.joblist_path = os.path.abspath(
-            os.path.join(self.project_dir, "joblist.txt")
-        )
+        if self.verbosity_on:
+            self.__v(f"Calling {inspect.currentframe()}")
         self.__v(f"Saving joblist to: {self.joblist_path}")
-        if not isinstance(joblist, Iterable):  # must be a list or other iterable
-            raise TypeError(f"Error! Joblist must be an iterable! Got {type(joblist)}")
-        f = open(self.joblist_path, "w")
-        for elem in joblist:
-            if type(elem) is not str:
-                raise TypeError(f"Error! Jobs type must be string! Got {type(elem)}")
-            f.write(f"{elem.rstrip()}\n")
-            self.jobs_num += 1
-        f.close()
+        joblist = _joblist_to_list(joblist)
+        if self.validate_joblist and not all(type(elem) is str for elem in joblist):
+            bad_elem = next(elem for elem in joblist if type(elem) is not str)
+            raise TypeError(f"Error! Jobs type must be string! Got {type(bad_elem)}")
+        if self.dedupe_jobs:
+            # keep the first occurrence of each job
+            joblist = list(dict.fromkeys(elem.rstrip() for elem in joblist))
+        self.jobs_num = len(joblist)
+        hash_path = self.__get_project_file_path(JOBLIST_HASH_FILENAME)
+        try:
+            with open(hash_path, "r", opener=self.__project_file_opener) as f:
+                written_digest = f.read()
+        except FileNotFoundError:
+            written_digest = None
+        if written_digest is not None:
+            # if the same joblist is executed again in the same project dir
+            # there is no need to rewrite a possibly huge file
+            joblist_digest = self.__get_joblist_hash(self.__get_joblist_batches(joblist)).hexdigest()
+            if written_digest == joblist_digest and os.path.isfile(self.joblist_path):
+                self.__v(f"Joblist {self.joblist_path} is up to date")
+                return
+            # the joblist is going to change: an interrupted write must not look valid
+            os.remove(hash_path, dir_fd=self.__project_dir_fd)
+        # the content is hashed while it's written, not encoded twice
+        joblist_hash = self.__get_joblist_hash()
+        joblist_path = self.__get_project_file_path(JOBLIST_FILENAME)
+        with open(joblist_path, "wb", buffering=JOBLIST_BUFFER_SIZE, opener=self.__project_file_opener) as f:
+            for batch in self.__get_joblist_batches(joblist):
+                joblist_hash.update(batch)
+                f.write(batch)
+        with open(hash_path, "w", opener=self.__project_file_opener) as f:
+            f.write(joblist_hash.hexdigest())
+
+    def __get_joblist_batches(self, joblist):
+        """Generate joblist file content, encoded, batch by batch.
+
+        Lines are generated on the fly: no second copy of a huge joblist in memory.
+        """
+        if self.cluster_size > 1:
+            # run several jobs within one nextflow task to save scheduling overhead
+            # each job runs in its own subshell: a trailing ";", cd or variables
+            # of one job must not affect the next one
+            lines = (
+                " && ".join([f"( {elem.rstrip()} )" for elem in joblist[i: i + self.cluster_size]])
+                for i in range(0, len(joblist), self.cluster_size)
+            )
+        else:
+            lines = (elem.rstrip() for elem in joblist)
+        # join and encode a batch of lines at once instead of going through text io for each line
+        batch = list(itertools.islice(lines, JOBLIST_WRITE_BATCH))
+        while batch:
+            batch.append("")  # newline after the last line as well
+            yield "\n".join(batch).encode("utf-8")
+            batch = list(itertools.islice(lines, JOBLIST_WRITE_BATCH))
+
+    def __get_project_file_path(self, filename):
+        """Get path to open a project file with __project_file_opener."""
+        if self.__project_dir_fd is None:
+            return os.path.join(self.project_dir, filename)
+        return filename
+
+    def __project_file_opener(self, path, flags):
+        """Opener resolving relative paths against the project dir descriptor."""
+        return os.open(path, flags, 0o666, dir_fd=self.__project_dir_fd)
+
+    @staticmethod
+    def __get_joblist_hash(batches=()):
+        """Get hash object of joblist file content, given as encoded batches."""
+        import hashlib
+        joblist_hash = hashlib.blake2b(digest_size=16)
+        for batch in batches:
+            joblist_hash.update(batch)
+        return joblist_hash
 
     def get_nf_log(self, first=False):
         """Retrieve nextflow log.
@@ -435,13 +840,13 @@ class Nextflow:
         Return None if nextflow logs are absent.
         As default shows the latest log.
         If first flag is set, returns the first one."""
-        if os.path.isdir(self.project_dir):
-            files_in_proj_dir = os.listdir(self.project_dir)
-        else:  # no dir: no logs
+        try:
+            with os.scandir(self.project_dir) as entries:
+                nf_log_files = [
+                    entry.name for entry in entries if entry.name.startswith(NEXTFLOW_LOG_FILENAME)
+                ]
+        except (FileNotFoundError, NotADirectoryError):  # no dir: no logs
             return None
-        nf_log_files = [
-            f for f in files_in_proj_dir if f.startswith(NEXTFLOW_LOG_FILENAME)
-        ]
         if len(nf_log_files) == 0:
             # no logs: nothing to return
             return None
@@ -463,25 +868,17 @@ class Nextflow:
                 f"found in the {self.project_dir}"
             )
             warnings.warn(msg)
-        # we are here: let's remove .nextflow.log for simplicity, other files can be split(".")
-        # -> lets us to get a number
-        nf_log_files = [x for x in nf_log_files if x != NEXTFLOW_LOG_FILENAME]
-        print(nf_log_files)
-        dot_splits = [x.split(".") for x in nf_log_files]
-        # maybe a bit paranoid, but what if someone put something line .nextflow.logxxxx inside?
-        # we need only the splits with 4 elements: ["", "nextflow", "log", "X"]
-        dot_splits_len = [x for x in dot_splits if len(x) == 4]
-        if len(dot_splits_len) == 0:
-            return None
-        # also we need the 3th element to be a number, what if there is something
-        # .nextflow.log.trash inside?
-        dot_splits_numeric = [x for x in dot_splits_len if x[3].isnumeric()]
-        if len(dot_splits_numeric) == 0:
+        # we are here: need numbered logs only: .nextflow.log.X
+        num_to_filename = []
+        for filename in nf_log_files:
+            suffix = filename[len(NEXTFLOW_LOG_FILENAME):]
+            # maybe a bit paranoid, but what if someone put something line .nextflow.logxxxx
+            # or .nextflow.log.trash inside?
+            if suffix[:1] == "." and suffix[1:].isdecimal():
+                num_to_filename.append((int(suffix[1:]), filename))
+        if len(num_to_filename) == 0:
             return None
-        # well, seems like there are numbers only
-        num_to_filename = [(int(x[3]), ".".join(x)) for x in dot_splits_numeric]
-        sorted_by_num = sorted(num_to_filename, key=lambda x: x[0])
-        to_open = sorted_by_num[0][1] if first else sorted_by_num[-1][1]
+        to_open = min(num_to_filename)[1] if first else max(num_to_filename)[1]
         path_to_open = os.path.join(self.project_dir, to_open)
         return self._get_file_content(path_to_open)
 
@@ -505,7 +902,7 @@ class Nextflow:
     @staticmethod
     def _get_tmstmp():
         """Get current timestamp."""
-        return str(time.time()).split(".")[0]
+        return str(int(time.time()))
 
     @staticmethod
     def _get_file_content(path):
@@ -518,14 +915,30 @@ class Nextflow:
 
 
 def pick_executor():
-    """Pick the best possible executor."""
+    """Pick the best possible executor.
+
+    The result depends on PATH only, so it's cached per PATH value.
+    Like in _which_cached, only found executors are cached: a scheduler
+    loaded later on the same PATH must still be picked.
+    """
+    path_env = os.environ.get("PATH", "")
+    executor = _PICKED_EXECUTOR_CACHE.get(path_env)
+    if executor is None:
+        executor = _pick_executor()
+        if executor != LOCAL:
+            _PICKED_EXECUTOR_CACHE[path_env] = executor
+    return executor
+
+
+def _pick_executor():
+    """Probe executors in order, return the first available one."""
     # TODO: if qsub is available then we need some extra procedure
     # please see issue #1
     for executor, dep_bin in Nextflow.executor_to_depend.items():
         if dep_bin is None:
             # here we cannot say for sure
             continue
-        depend_available = shutil.which(dep_bin)
+        depend_available = _which_cached(dep_bin)
         if depend_available is None:
             continue
         return executor
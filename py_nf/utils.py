@@ -1,13 +1,118 @@
 """Utils that make using py_nf easier."""
 import os
+import re
 import sys
+import stat
 import shutil
-import subprocess
-from collections import Iterable
+from collections import defaultdict
 from .version import __version__
 
 LOCAL = "local"
 NEXTFLOW = "nextflow"
+ARGUMENT_RE = re.compile(r"\S+")
+# list a directory only if that many arguments might be located there,
+# for fewer arguments separate stat calls are cheaper than reading a large directory
+SCANDIR_MIN_ARGS = 4
+# files are opened relative to a directory fd where the platform allows
+OPEN_DIR_FD_SUPPORTED = os.open in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+# (executable, PATH) -> full path to executable
+_WHICH_CACHE = {}
+
+
+def _which_cached(exe):
+    """Cached shutil.which.
+
+    Only found executables are cached: an executable installed
+    later must still be found. The cache is keyed by PATH too.
+    """
+    key = (exe, os.environ.get("PATH", ""))
+    exe_path = _WHICH_CACHE.get(key)
+    if exe_path is None:
+        exe_path = shutil.which(exe)
+        if exe_path is not None:
+            _WHICH_CACHE[key] = exe_path
+    return exe_path
+
+
+def _joblist_to_list(joblist):
+    """Return jobs of any iterable joblist as a list.
+
+    A string is iterable too, but it would be split into characters.
+    """
+    try:
+        jobs = iter(joblist)
+    except TypeError:
+        jobs = None
+    if jobs is None or isinstance(joblist, (str, bytes)):
+        raise TypeError(f"Error! Joblist must be an iterable! Got {type(joblist)}")
+    return list(jobs)
+
+
+def _is_file_or_dir(elem):
+    """Check whether elem is an existing file or directory with one stat call."""
+    try:
+        mode = os.stat(elem).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISREG(mode) or stat.S_ISDIR(mode)
+
+
+def _get_dir_paths(dir_path):
+    """Get names of files and directories located in dir_path.
+
+    Returns None if the directory cannot be listed.
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            # DirEntry methods follow symlinks, like stat does
+            return {entry.name for entry in entries if entry.is_file() or entry.is_dir()}
+    except OSError:
+        return None
+
+
+def _resolve_paths_bulk(elems):
+    """Map each of elems to its absolute path if that's an existing file or dir.
+
+    Elements that are not paths are mapped to themselves.
+    Absolute paths are interned: the same paths are shared between calls.
+    Arguments are grouped by parent directory, directories shared by
+    many arguments are listed once instead of calling stat for each of them.
+    """
+    parent_to_elems = defaultdict(list)
+    to_stat = []
+    elem_to_upd = {}
+    for elem in set(elems):
+        if elem.startswith("-"):
+            # command line option, not a path
+            elem_to_upd[elem] = elem
+            continue
+        parent, name = os.path.split(elem)
+        if name in ("", ".", "..") or "\0" in elem:
+            # cannot be found in a directory listing
+            to_stat.append(elem)
+            continue
+        parent_to_elems[parent or os.curdir].append((elem, name))
+
+    # the same as os.path.abspath, which gets cwd for each call
+    cwd = os.getcwd()
+
+    def get_abspath(path):
+        return sys.intern(os.path.normpath(os.path.join(cwd, path)))
+
+    for parent, parent_elems in parent_to_elems.items():
+        if len(parent_elems) < SCANDIR_MIN_ARGS:
+            to_stat.extend(elem for elem, _ in parent_elems)
+            continue
+        dir_paths = _get_dir_paths(parent)
+        if dir_paths is None:
+            # not a directory or cannot list it
+            to_stat.extend(elem for elem, _ in parent_elems)
+            continue
+        for elem, name in parent_elems:
+            elem_to_upd[elem] = get_abspath(elem) if name in dir_paths else elem
+    for elem in to_stat:
+        elem_to_upd[elem] = get_abspath(elem) if _is_file_or_dir(elem) else elem
+    return elem_to_upd
 
 
 def paths_to_abspaths_in_line(line):
@@ -17,38 +122,38 @@ def paths_to_abspaths_in_line(line):
     script.py in/file1.txt out/file1.txt -v is transformed into:
     /home/user/proj/script.py /home/user/proj/in/file1.txt /home/user/proj/out/file1.txt -v
     """
-    if not isinstance(line, str):
-        err_msg = (
-            f"paths_to_abspaths_in_line expects a string as input, got {type(line)}"
-        )
-        raise ValueError(err_msg)
-    # command is a space-separated list of arguments, some of them are paths
-    line_pieces = line.split()
-    upd_pieces = []
-    for elem in line_pieces:
-        # is parameter is not a path: we are not interested in it
-        # else, it might be either a file or a directory
-        is_file = os.path.isfile(elem)
-        is_dir = os.path.isdir(elem)
-        is_path = is_file or is_dir
-        if not is_path:
-            upd_pieces.append(elem)
-            continue
-        abspath = os.path.abspath(elem)
-        upd_pieces.append(abspath)
-    upd_string = " ".join(upd_pieces)
-    return upd_string
+    return paths_to_abspaths_in_joblist([line])[0]
 
 
 def paths_to_abspaths_in_joblist(joblist):
-    """Just apply replace_all_paths_to_abspaths_in_line to each job."""
-    if not isinstance(joblist, Iterable):  # must be a list or other iterable
-        raise TypeError(f"Error! Joblist must be an iterable! Got {type(joblist)}")
-    upd_joblist = []
+    """Just apply replace_all_paths_to_abspaths_in_line to each job.
+
+    All jobs are processed at once: jobs tend to share the same
+    paths and directories, so each of them is checked once.
+    """
+    joblist = _joblist_to_list(joblist)
+    # command is a whitespace-separated list of arguments, some of them are paths
     for line in joblist:
-        # just apply func to each line
-        upd_line = paths_to_abspaths_in_line(line)
-        upd_joblist.append(upd_line)
+        if not isinstance(line, str):
+            err_msg = (
+                f"paths_to_abspaths_in_line expects a string as input, got {type(line)}"
+            )
+            raise ValueError(err_msg)
+    # is parameter is not a path: we are not interested in it
+    # else, it might be either a file or a directory
+    line_args = [ARGUMENT_RE.findall(line) for line in joblist]
+    elem_to_upd = _resolve_paths_bulk(elem for args in line_args for elem in args)
+    # lines without paths, like "echo hello world", are kept as they are
+    paths = {elem for elem, upd_elem in elem_to_upd.items() if upd_elem is not elem}
+
+    def replace_arg(match):
+        return elem_to_upd[match.group()]
+
+    # replace arguments in place, the original whitespace is kept
+    upd_joblist = [
+        line if paths.isdisjoint(args) else ARGUMENT_RE.sub(replace_arg, line)
+        for line, args in zip(joblist, line_args)
+    ]
     return upd_joblist
 
 
@@ -58,7 +163,8 @@ def install_nf_if_not_installed():
     If already installed: return path to nextflow.
     If not: install and return abspath to installed NF.
     If impossible: raise an Error."""
-    nf_here = shutil.which(NEXTFLOW)
+    import subprocess  # only needed here, keeps importing utils fast
+    nf_here = _which_cached(NEXTFLOW)
     if nf_here is not None:
         # this is likely installed
         return nf_here
@@ -75,7 +181,7 @@ def install_nf_if_not_installed():
         sys.stderr.write(f"Trying to install nextflow with conda...\n")
     try:
         subprocess.call(cmd_2, shell=True)
-        return shutil.which(NEXTFLOW)
+        return _which_cached(NEXTFLOW)
     except subprocess.CalledProcessError:
         sys.stderr.write("Error! Could not install nextflow.\nAbort\n")
         sys.exit(1)
@@ -1,54 +1,89 @@
 #!/usr/bin/env python3
 """Sample script to imitate work."""
+import os
 import sys
 import time
+from functools import lru_cache
+
+# seconds to sleep per sequence char, to imitate slow jobs
+SAMPLE_SLEEP = float(os.environ.get("PY_NF_SAMPLE_SLEEP", "0"))
+# process sequences in parallel only if there are that many of them,
+# starting a process pool takes longer than handling a few sequences
+PARALLEL_MIN_SEQS = 64
+# substitution applied to ASCII sequences in one C-level pass, identity for now,
+# like bytes.maketrans(b"ACGTacgt", b"TGCAtgca") to complement the sequence
+SEQ_TRANSLATION = bytes.maketrans(b"", b"")
 
 
 def read_fasta(in_f):
     """Read fasta file.
 
     Not polished version, just for test."""
-    f = open(in_f, "r")
-    content = f.read().split(">")
-    f.close()
-    del content[0]
     name_to_seq = {}
-    for elem in content:
-        lines = elem.split("\n")
-        header = lines[0]
-        seq = "".join(lines[1:])
-        name_to_seq[header] = seq
+    header = None
+    seq_lines = []
+    with open(in_f, "r") as f:
+        for line in f:
+            if line.startswith(">"):
+                if header is not None:
+                    name_to_seq[header] = "".join(seq_lines)
+                header = line[1:].rstrip("\n")
+                seq_lines = []
+            else:
+                seq_lines.append(line.rstrip("\n"))
+    if header is not None:
+        name_to_seq[header] = "".join(seq_lines)
     return name_to_seq
 
 
+# duplicated sequences are handled once, inputs and outputs are kept anyway
+@lru_cache(maxsize=None)
 def modify_seq(sequence):
-    """Perform something time-consuming."""
-    out = b""  # string concatenation if pretty heavy, fine
-    for c in sequence:
-        b = c.encode()
-        c_num = ord(c)
-        for i in range(255):
-            if i == c_num:
-                out = b + out
-        out = out[::-1]
-        time.sleep(0.01)
+    """Perform something time-consuming.
+
+    Set PY_NF_SAMPLE_SLEEP env variable (like 0.01) to make it really slow."""
+    if SAMPLE_SLEEP <= 0 and sequence.isascii():
+        # one byte per char: the same as the loop below, done with slices
+        data = sequence.encode("ascii").translate(SEQ_TRANSLATION)
+        out = data[0::2][::-1] + data[1::2]
+        return (out[::-1] if len(data) % 2 else out).decode("ascii")
+    # prepending a char and reversing the result each step is the same as
+    # prepending on odd steps and appending on even steps, then reversing
+    # the result once if the number of steps is odd
+    head = bytearray()  # prepended bytes, in reverse order
+    tail = bytearray()
+    for num, c in enumerate(sequence):
+        if ord(c) < 255:
+            # chars out of 0..254 range are skipped
+            # reversing the output reverses bytes of multibyte chars too
+            (head if num % 2 == 0 else tail).extend(c.encode()[::-1])
+        if SAMPLE_SLEEP > 0:
+            time.sleep(SAMPLE_SLEEP)
+    head.reverse()
+    out = head + tail
+    if len(sequence) % 2:
+        out.reverse()
     return out.decode("utf-8")
 
 
 def do_something_on_sequences(seqs):
     """Imitate some sequences analysis."""
-    out_seqs = {}
-    for k, v in seqs.items():
-        out_seqs[k] = modify_seq(v)
-    return out_seqs
+    if len(seqs) < PARALLEL_MIN_SEQS:
+        return {k: modify_seq(v) for k, v in seqs.items()}
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as executor:
+        out_seqs = executor.map(modify_seq, seqs.values(), chunksize=16)
+        return dict(zip(seqs.keys(), out_seqs))
 
 
 def save_fasta(seq, out_f):
     """Save fasta file."""
-    f = open(out_f, "w") if out_file != "stdout" else sys.stdout
-    for k, v in seq.items():
-        f.write(f">{k}\n{v}\n")
-    f.close() if out_file != "stdout" else None
+    lines = [f">{k}\n{v}\n" for k, v in seq.items()]
+    if out_f == "stdout":
+        sys.stdout.writelines(lines)
+        return
+    with open(out_f, "w", buffering=1 << 20) as f:
+        f.writelines(lines)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,10 @@
 import sys
 import os
 import shutil
+import mmap
+import signal
+import asyncio
+from datetime import timedelta
 import pytest
 
 # a temporary solution for import error:
@@ -11,11 +15,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from py_nf.py_nf import Nextflow
 from py_nf.py_nf import pick_executor
 from py_nf.utils import paths_to_abspaths_in_joblist
+from py_nf.nf_logs_analysis import NextflowLog
+from py_nf.nf_logs_analysis import NextflowTime
+from py_nf.nf_logs_analysis import NFTaskHandler
 
 
 def get_joblist(sample_num):
     """Generate joblist."""
-    test_path = os.path.dirname(__file__)
+    # all paths below are built from this absolute one, no abspath calls needed
+    test_path = os.path.dirname(os.path.abspath(__file__))
     sample_script = os.path.join(test_path, "sample_script.py")
     if sample_num == 1:
         jobs = []
@@ -26,14 +34,14 @@ def get_joblist(sample_num):
         exp_out_dir = os.path.join(test_path, "expected_output", "sample_1")
         for i in range(1, 5):
             in_out_filename = f"file_{i}.fa"
-            in_path = os.path.abspath(os.path.join(in_dir, in_out_filename))
-            out_path = os.path.abspath(os.path.join(out_dir, in_out_filename))
-            exp_out_path = os.path.abspath(os.path.join(exp_out_dir, in_out_filename))
+            in_path = os.path.join(in_dir, in_out_filename)
+            out_path = os.path.join(out_dir, in_out_filename)
+            exp_out_path = os.path.join(exp_out_dir, in_out_filename)
             cmd = f"python3 {sample_script} {in_path} {out_path}"
             jobs.append(cmd)
             out_files.append(out_path)
             ref_result_files.append(exp_out_path)
-        os.mkdir(out_dir) if not os.path.isdir(out_dir) else None
+        os.makedirs(out_dir, exist_ok=True)
         to_compare = list(zip(out_files, ref_result_files))
         return jobs, to_compare
     if sample_num == 2:
@@ -43,6 +51,45 @@ def get_joblist(sample_num):
         raise ValueError(f"Test number {sample_num} doesn't exist")
 
 
+def make_nf_log_project():
+    """Create a nextflow project dir from the log fixture, return its path."""
+    test_path = os.path.dirname(os.path.abspath(__file__))
+    project_dir = os.path.join(test_path, "output", "nf_log_project")
+    work_dir = os.path.join(project_dir, "work")
+    os.makedirs(os.path.join(project_dir, ".nextflow"), exist_ok=True)
+    # tasks 1 and 3 execute the same command
+    task_dir_to_cmd = {"1a/2b3c4d5e6f": "echo 1\n", "5e/6f7a8b9c0d": "echo 2\n", "9c/0d1e2f3a4b": "echo 1\n"}
+    for task_dir, cmd in task_dir_to_cmd.items():
+        os.makedirs(os.path.join(work_dir, task_dir), exist_ok=True)
+        with open(os.path.join(work_dir, task_dir, ".command.sh"), "w") as f:
+            f.write(cmd)
+        # like the nextflow one: not executable, runs .command.sh from the work dir
+        with open(os.path.join(work_dir, task_dir, ".command.run"), "w") as f:
+            f.write("bash .command.sh\n")
+    # work dir paths in the log are absolute
+    with open(os.path.join(test_path, "input_test", "nf_log", "nextflow.log"), "r") as f:
+        log = f.read().replace("{work_dir}", work_dir)
+    with open(os.path.join(project_dir, ".nextflow.log"), "w") as f:
+        f.write(log)
+    return project_dir
+
+
+def same_bytes(file_1, file_2):
+    """Check whether two files have the same bytes."""
+    size = os.path.getsize(file_1)
+    if size != os.path.getsize(file_2):
+        return False
+    if size == 0:
+        # an empty file cannot be mapped
+        return True
+    with open(file_1, "rb") as f_1, open(file_2, "rb") as f_2:
+        m_1 = mmap.mmap(f_1.fileno(), 0, access=mmap.ACCESS_READ)
+        m_2 = mmap.mmap(f_2.fileno(), 0, access=mmap.ACCESS_READ)
+        with m_1, m_2, memoryview(m_1) as v_1, memoryview(m_2) as v_2:
+            # memcmp over the mapped pages, nothing is copied
+            return v_1 == v_2
+
+
 def have_same_content(files_list):
     """Check that out and reference (expected output) files have the same content."""
     for elem in files_list:
@@ -50,11 +97,7 @@ def have_same_content(files_list):
         exp_out = elem[1]
         if not os.path.isfile(out_file):
             return False
-        with open(out_file, "r") as f:
-            out_str = f.read()
-        with open(exp_out, "r") as f:
-            exp_out_str = f.read()
-        if out_str != exp_out_str:
+        if not same_bytes(out_file, exp_out):
             return False
     return True
 
@@ -62,10 +105,23 @@ def have_same_content(files_list):
 if __name__ == "__main__":
     project_name_1 = "test_project_1"
     project_name_2 = "test_project_2"
+    project_name_3 = "test_project_3"
+    project_name_4 = "test_project_4"
+    project_name_5 = "test_project_5"
+    project_name_6 = "test_project_6"
+    project_name_7 = "test_project_7"
+    project_name_8 = "test_project_8"
+    project_name_9 = "test_project_9"
+    project_name_10 = "test_project_10"
     if "clean" in sys.argv:
-        projects = [project_name_1, project_name_2]
+        projects = [project_name_1, project_name_2, project_name_3, project_name_4,
+                    project_name_5, project_name_6, project_name_7, project_name_8,
+                    project_name_9, project_name_10]
         for project in projects:
-            shutil.rmtree(project) if os.path.isdir(project) else None
+            try:
+                shutil.rmtree(project)
+            except FileNotFoundError:
+                pass
         sys.exit("Cleaned")
     print("### Running test 1\n")
     nf_instance = Nextflow(
@@ -119,3 +175,143 @@ if __name__ == "__main__":
     else:
         print("Test 4: Fail")
         sys.exit(1)
+
+    print("### Running test 5: logs analysis\n")
+    nf_log_project = make_nf_log_project()
+    nf_time = NextflowTime(nf_log_project)
+    assert nf_time.year == 2020
+    assert nf_time.total_runtime() == timedelta(seconds=40)
+    assert nf_time.total_cpu_time() == timedelta(seconds=45)
+    assert nf_time.total_cpu_time(only_failed=True) == timedelta(seconds=30)
+    assert nf_time.average_job_runtime(only_success=True) == timedelta(seconds=7.5)
+    assert nf_time.longest_job() == (timedelta(seconds=30), "5e6f7a8b")
+    assert nf_time.longest_job(only_success=True) == (timedelta(seconds=10), "1a2b3c4d")
+    assert nf_time.job_to_data["9c0d1e2f"]["rc"] == 0
+    for workers in (1, 2):
+        nf_log = NextflowLog(nf_log_project, workers=workers)
+        assert nf_log.launcher_cmd == "nextflow script.nf -c config.nf"
+        tasks = [(t.task_id, t.status, t.exit) for t, _ in nf_log.command_to_tasks["echo 1\n"]]
+        assert tasks == [("3", "COMPLETED", "0"), ("1", "COMPLETED", "0")]
+        # grid-style line: jobId prefix and started/exited trailer after the path
+        grid_task = nf_log.command_to_tasks["echo 1\n"][0][0]
+        assert grid_task.wd == os.path.join(nf_log_project, "work", "9c", "0d1e2f3a4b")
+        assert [t.exit for t, _ in nf_log.command_to_tasks["echo 2\n"]] == ["1"]
+    tasks = [t for task_events in nf_log.command_to_tasks.values() for t, _ in task_events]
+    assert NFTaskHandler.bulk_execute_again(tasks) == [0, 0, 0]
+    shutil.rmtree(nf_log_project)
+    print("Test 5: OK")
+
+    print("### Running test 6: clustered multi-statement jobs\n")
+    cluster_out_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "cluster")
+    os.makedirs(cluster_out_dir, exist_ok=True)
+    cluster_jobs = [
+        # cd and variables of a job must not leak into the next one
+        "cd / && CLUSTER_VAR=1",
+        f"echo ${{CLUSTER_VAR:-unset}} $PWD > {cluster_out_dir}/job_2.txt",
+        # a trailing ; must not break the && chain
+        f"echo a > {cluster_out_dir}/job_3.txt;",
+        f"false; echo b > {cluster_out_dir}/job_4.txt",
+    ]
+    nf_instance = Nextflow(project_name=project_name_3, cluster_size=2, force_remove_logs=True)
+    status = nf_instance.execute(cluster_jobs)
+    assert status == 0
+    with open(os.path.join(cluster_out_dir, "job_2.txt"), "r") as f:
+        var_value, job_wd = f.read().split()
+    assert var_value == "unset" and job_wd != "/"
+    with open(os.path.join(cluster_out_dir, "job_3.txt"), "r") as f:
+        assert f.read() == "a\n"
+    with open(os.path.join(cluster_out_dir, "job_4.txt"), "r") as f:
+        assert f.read() == "b\n"
+    shutil.rmtree(cluster_out_dir)
+    print("Test 6: OK")
+
+    print("### Running test 7: executing the same joblist again\n")
+    nf_instance = Nextflow(project_name=project_name_4)
+    rerun_joblist = ["echo 1", "echo 2"]
+    assert nf_instance.execute(rerun_joblist) == 0
+    joblist_mtime = os.stat(nf_instance.joblist_path).st_mtime_ns
+    # the same joblist: the file is not written again
+    assert nf_instance.execute(rerun_joblist) == 0
+    assert os.stat(nf_instance.joblist_path).st_mtime_ns == joblist_mtime
+    # changed joblist: the file is rewritten
+    assert nf_instance.execute(["echo 3"]) == 0
+    with open(nf_instance.joblist_path, "r") as f:
+        assert f.read() == "echo 3\n"
+    shutil.rmtree(nf_instance.project_dir)
+    print("Test 7: OK")
+
+    print("### Running test 8: submit, poll and wait for completion\n")
+    nf_instance = Nextflow(project_name=project_name_5, force_remove_logs=True)
+    assert nf_instance.wait_for_completion() is None  # nothing submitted yet
+    nf_instance.submit(["sleep 1"])
+    assert nf_instance.poll() is None  # still running
+    # the running pipeline must not be replaced by another one
+    with pytest.raises(RuntimeError):
+        nf_instance.submit(["echo 1"])
+    assert nf_instance.wait_for_completion(timeout=0.01) is None
+    assert nf_instance.wait_for_completion() == 0
+    # the pipeline is finished: the same status is returned again
+    assert nf_instance.poll() == 0
+    assert nf_instance.executed_with_success is True
+    nf_instance.submit(["false"])
+    assert nf_instance.wait_for_completion() == 1
+    assert nf_instance.executed_with_success is False
+    print("Test 8: OK")
+
+    print("### Running test 9: execute_async and gather\n")
+    nf_instance_1 = Nextflow(project_name=project_name_6, force_remove_logs=True)
+    nf_instance_2 = Nextflow(project_name=project_name_7, force_remove_logs=True)
+    statuses = Nextflow.gather([(nf_instance_1, ["echo 1"]), (nf_instance_2, ["false"])])
+    assert statuses == [0, 1]
+    assert nf_instance_1.executed_with_success and not nf_instance_2.executed_with_success
+    print("Test 9: OK")
+
+    print("### Running test 10: inline and split config\n")
+    nf_instance = Nextflow(project_name=project_name_8)
+    assert nf_instance.execute(["echo 1"]) == 0
+    # by default process settings are written to the script, no config file
+    assert nf_instance.nextflow_config_path is None
+    with open(nf_instance.nextflow_script_path, "r") as f:
+        assert "    executor 'local'\n" in f.read()
+    nf_instance.split_config = True
+    assert nf_instance.execute(["echo 1"]) == 0
+    assert os.path.isfile(nf_instance.nextflow_config_path)
+    with open(nf_instance.nextflow_script_path, "r") as f:
+        assert "    executor 'local'\n" not in f.read()
+    shutil.rmtree(nf_instance.project_dir)
+    print("Test 10: OK")
+
+    print("### Running test 11: capture output\n")
+    nf_instance = Nextflow(project_name=project_name_9, capture_output=True, force_remove_logs=True)
+    assert nf_instance.execute(["echo 1"]) == 0
+    assert nf_instance.stdout and nf_instance.stderr is not None
+    # execute_async captures the output as well
+    assert Nextflow.gather([(nf_instance, ["echo 1"])]) == [0]
+    assert nf_instance.stdout and nf_instance.stderr is not None
+    print("Test 11: OK")
+
+    print("### Running test 12: interrupted execution kills nextflow\n")
+
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    nf_instance = Nextflow(project_name=project_name_10, force_remove_logs=True)
+    signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, 0.5)
+    with pytest.raises(KeyboardInterrupt):
+        nf_instance.execute(["sleep 3"])
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    # nextflow is killed, the pipeline is finished and failed
+    assert nf_instance.poll() == 1
+
+    async def cancel_execution():
+        task = asyncio.ensure_future(nf_instance.execute_async(["sleep 3"]))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(cancel_execution())
+    assert nf_instance.poll() == 1
+    # nothing is running anymore, the instance can be used again
+    assert nf_instance.execute(["echo 1"]) == 0
+    print("Test 12: OK")